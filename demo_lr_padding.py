@@ -14,9 +14,26 @@
 
 import time
 import os
+import threading
 from realtimemix import AudioEngine
 
 
+def load_and_wait(engine, track_id, source, timeout=10.0, **kwargs):
+    """加载音轨并等待 on_complete 回调，返回是否加载成功"""
+    done = threading.Event()
+    result = {"success": False}
+
+    def on_complete(track_id, success, error=None):
+        result["success"] = success
+        if error:
+            print(f"  ❌ 加载错误: {error}")
+        done.set()
+
+    if not engine.load_track(track_id, source, on_complete=on_complete, **kwargs):
+        return False
+    return done.wait(timeout) and result["success"]
+
+
 def demo_padding_combinations():
     """演示不同的静音填充组合"""
     
@@ -46,12 +63,10 @@ def demo_padding_combinations():
     try:
         # 演示1：只添加左侧静音（前500ms）
         print("=== 演示1：只添加左侧静音 ===")
-        engine.load_track("demo1", audio_file, 
-                         silent_lpadding_ms=500.0,  # 前面500ms静音
-                         silent_rpadding_ms=0.0)    # 后面无静音
-        
-        # 等待加载完成
-        time.sleep(2)
+        # 加载并等待完成
+        load_and_wait(engine, "demo1", audio_file,
+                      silent_lpadding_ms=500.0,  # 前面500ms静音
+                      silent_rpadding_ms=0.0)    # 后面无静音
         
         info1 = engine.get_track_info("demo1")
         if info1:
@@ -71,12 +86,10 @@ def demo_padding_combinations():
         
         # 演示2：只添加右侧静音（后800ms）
         print("=== 演示2：只添加右侧静音 ===")
-        engine.load_track("demo2", audio_file,
-                         silent_lpadding_ms=0.0,    # 前面无静音
-                         silent_rpadding_ms=800.0)  # 后面800ms静音
-        
-        # 等待加载完成
-        time.sleep(2)
+        # 加载并等待完成
+        load_and_wait(engine, "demo2", audio_file,
+                      silent_lpadding_ms=0.0,    # 前面无静音
+                      silent_rpadding_ms=800.0)  # 后面800ms静音
         
         info2 = engine.get_track_info("demo2")
         if info2:
@@ -96,12 +109,10 @@ def demo_padding_combinations():
         
         # 演示3：左右不同长度的静音
         print("=== 演示3：左右不同长度的静音 ===")
-        engine.load_track("demo3", audio_file,
-                         silent_lpadding_ms=200.0,  # 前面200ms静音
-                         silent_rpadding_ms=1000.0) # 后面1000ms静音
-        
-        # 等待加载完成
-        time.sleep(2)
+        # 加载并等待完成
+        load_and_wait(engine, "demo3", audio_file,
+                      silent_lpadding_ms=200.0,  # 前面200ms静音
+                      silent_rpadding_ms=1000.0) # 后面1000ms静音
         
         info3 = engine.get_track_info("demo3")
         if info3:
@@ -121,12 +132,10 @@ def demo_padding_combinations():
         
         # 演示4：传统的前后相同静音（兼容性）
         print("=== 演示4：传统的前后相同静音 ===")
-        engine.load_track("demo4", audio_file,
-                         silent_lpadding_ms=300.0,  # 前面300ms静音
-                         silent_rpadding_ms=300.0)  # 后面300ms静音
-        
-        # 等待加载完成
-        time.sleep(2)
+        # 加载并等待完成
+        load_and_wait(engine, "demo4", audio_file,
+                      silent_lpadding_ms=300.0,  # 前面300ms静音
+                      silent_rpadding_ms=300.0)  # 后面300ms静音
         
         info4 = engine.get_track_info("demo4")
         if info4:
@@ -41,7 +41,9 @@ def main():
         # Generate white noise
         noise_duration = 2.0
         noise_samples = int(sample_rate * noise_duration)
-        white_noise = 0.1 * np.random.randn(noise_samples, 2).astype(np.float32)
+        rng = np.random.Generator(np.random.SFC64())
+        white_noise = rng.standard_normal((noise_samples, 2), dtype=np.float32)
+        white_noise *= 0.1
         
         # Load the audio data into tracks
         print("Loading tracks...")
@@ -16,6 +16,7 @@ import time
 import numpy as np
 from typing import Optional
 from realtimemix import AudioEngine
+from signal_utils import sine_wave, to_stereo
 
 
 class AudioCallbackManager:
@@ -57,10 +58,9 @@ class AudioCallbackManager:
     def generate_beep(self, frequency: float = 800.0, duration: float = 0.5) -> np.ndarray:
         """生成提示音"""
         frames = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, frames, False)
         
         # 生成正弦波提示音
-        beep = np.sin(2 * np.pi * frequency * t) * 0.7
+        beep = sine_wave(frequency, frames, self.sample_rate) * 0.7
         
         # 添加包络
         envelope = np.ones_like(beep)
@@ -69,20 +69,19 @@ class AudioCallbackManager:
         envelope[-fade_frames:] = np.linspace(1, 0, fade_frames)
         
         beep *= envelope
-        return np.column_stack((beep, beep)).astype(np.float32)
+        return to_stereo(beep)
     
     def generate_notification_sound(self, duration: float = 1.0) -> np.ndarray:
         """生成通知音"""
         frames = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, frames, False)
         
         # 生成双音调通知音 (800Hz + 1000Hz)
-        tone1 = np.sin(2 * np.pi * 800 * t) * 0.4
-        tone2 = np.sin(2 * np.pi * 1000 * t) * 0.3
+        tone1 = sine_wave(800, frames, self.sample_rate) * 0.4
+        tone2 = sine_wave(1000, frames, self.sample_rate) * 0.3
         notification = tone1 + tone2
         
         # 添加颤音效果
-        tremolo = 0.3 * np.sin(2 * np.pi * 6 * t) + 0.7
+        tremolo = 0.3 * sine_wave(6, frames, self.sample_rate) + 0.7
         notification *= tremolo
         
         # 添加包络
@@ -92,7 +91,7 @@ class AudioCallbackManager:
         envelope[-fade_frames:] = np.linspace(1, 0, fade_frames)
         
         notification *= envelope
-        return np.column_stack((notification, notification)).astype(np.float32)
+        return to_stereo(notification)
     
     def load_main_audio(self, audio_data: np.ndarray, track_id: str = "main_audio") -> bool:
         """加载主音频"""
@@ -215,18 +214,23 @@ class AudioCallbackManager:
     def monitor_playback(self, track_id: str, duration: float):
         """监控播放状态"""
         print(f"⏳ 监控播放状态 ({duration:.1f}s)...")
+        status_interval = 3.0  # 每3秒显示状态
         start_time = time.time()
+        next_status = 0.0
         
-        while time.time() - start_time < duration:
+        while True:
             current_time = time.time() - start_time
+            if current_time >= duration:
+                break
             
-            # 每3秒显示状态
-            if int(current_time) % 3 == 0 and current_time - int(current_time) < 0.1:
+            if current_time >= next_status:
                 playing_tracks = self.engine.get_playing_tracks()
                 is_muted = self.engine.is_muted(track_id)
                 print(f"⏱️  {current_time:.1f}s - 播放轨道: {playing_tracks}, 主轨静音: {is_muted}")
+                next_status += status_interval
             
-            time.sleep(0.1)
+            # 直接睡到下一个状态点，而不是每100ms轮询一次；状态输出超时导致差值为负时不睡
+            time.sleep(max(0.0, min(next_status, duration) - current_time))
         
         print("⏹️ 停止播放...")
         self.engine.stop_all_tracks(fade_out=False)
@@ -249,16 +253,15 @@ def demo_simple_callback():
         # 生成演示音频 (10秒, 440Hz低音)
         duration = 10.0
         frames = int(duration * manager.sample_rate)
-        t = np.linspace(0, duration, frames, False)
         
         # 低频背景音
-        background = np.sin(2 * np.pi * 220 * t) * 0.4
+        background = sine_wave(220, frames, manager.sample_rate) * 0.4
         # 添加颤音
-        tremolo = 0.3 * np.sin(2 * np.pi * 3 * t) + 0.7
+        tremolo = 0.3 * sine_wave(3, frames, manager.sample_rate) + 0.7
         background *= tremolo
         
         # 立体声
-        audio_data = np.column_stack((background, background)).astype(np.float32)
+        audio_data = to_stereo(background)
         
         # 加载音频
         if not manager.load_main_audio(audio_data):
@@ -307,18 +310,17 @@ def demo_multiple_callbacks():
         # 生成更长的演示音频 (15秒, 多频率混合)
         duration = 15.0
         frames = int(duration * manager.sample_rate)
-        t = np.linspace(0, duration, frames, False)
         
         # 复合背景音 (多个正弦波)
         freq1 = 220.0  # 低音
         freq2 = 330.0  # 中音
-        audio1 = np.sin(2 * np.pi * freq1 * t) * 0.3
-        audio2 = np.sin(2 * np.pi * freq2 * t) * 0.2
+        audio1 = sine_wave(freq1, frames, manager.sample_rate) * 0.3
+        audio2 = sine_wave(freq2, frames, manager.sample_rate) * 0.2
         
         background = audio1 + audio2
         
         # 立体声
-        audio_data = np.column_stack((background, background)).astype(np.float32)
+        audio_data = to_stereo(background)
         
         # 加载音频
         if not manager.load_main_audio(audio_data):
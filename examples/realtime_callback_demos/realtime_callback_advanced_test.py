@@ -17,6 +17,7 @@ import threading
 import numpy as np
 from typing import Optional, Callable, Dict, Any, List
 from realtimemix import AudioEngine
+from signal_utils import sine_wave, to_stereo
 
 
 class AdvancedCallbackTester:
@@ -75,21 +76,22 @@ class AdvancedCallbackTester:
                           amplitude: float = 0.5, modulation: Optional[str] = None) -> np.ndarray:
         """生成多样化的测试音频"""
         frames = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, frames, False)
         
-        # 基础正弦波
-        audio_signal = np.sin(2 * np.pi * frequency * t) * amplitude
-        
-        # 添加调制效果
-        if modulation == "tremolo":
-            # 颤音效果
-            tremolo_freq = 5.0  # 5Hz颤音
-            tremolo = 0.3 * np.sin(2 * np.pi * tremolo_freq * t) + 0.7
-            audio_signal *= tremolo
-        elif modulation == "sweep":
-            # 频率扫描
-            freq_sweep = frequency + 200 * t / duration
-            audio_signal = np.sin(2 * np.pi * freq_sweep * t) * amplitude
+        if modulation == "sweep":
+            # 频率扫描：相位直接由样本索引计算，无需单独的时间轴数组
+            n = np.arange(frames, dtype=np.float64)
+            freq_sweep = frequency + 200.0 * n / frames
+            audio_signal = np.sin((2 * np.pi / self.sample_rate) * freq_sweep * n).astype(np.float32)
+            audio_signal *= amplitude
+        else:
+            # 基础正弦波
+            audio_signal = sine_wave(frequency, frames, self.sample_rate) * amplitude
+            
+            if modulation == "tremolo":
+                # 颤音效果
+                tremolo_freq = 5.0  # 5Hz颤音
+                tremolo = 0.3 * sine_wave(tremolo_freq, frames, self.sample_rate) + 0.7
+                audio_signal *= tremolo
         
         # 添加包络
         envelope = np.ones_like(audio_signal)
@@ -101,8 +103,8 @@ class AdvancedCallbackTester:
         
         audio_signal *= envelope
         
-        # 转换为立体声
-        return np.column_stack((audio_signal, audio_signal)).astype(np.float32)
+        # 转换为立体声（直接写入float32缓冲区，省去一次整块拷贝）
+        return to_stereo(audio_signal)
     
     def start_engine(self) -> bool:
         """启动音频引擎"""
@@ -328,20 +330,22 @@ class AdvancedCallbackTester:
             total_duration = 20.0
             self._print(f"监控播放状态 ({total_duration}s)...", "TEST")
             
-            last_status_time = 0
-            while time.time() - start_time < total_duration:
+            status_interval = 2.0  # 每2秒显示一次状态
+            next_status = status_interval
+            while True:
                 current_time = time.time() - start_time
+                if current_time >= total_duration:
+                    break
                 
-                # 每2秒显示一次状态
-                if current_time - last_status_time >= 2.0:
-                    playing_tracks = self.engine.get_playing_tracks()
-                    main_info = self.engine.get_track_info("main_track")
-                    is_muted = self.engine.is_muted("main_track")
-                    
-                    self._print(f"⏱️  {current_time:.1f}s - 播放轨道: {playing_tracks}, 主音轨静音: {is_muted}")
-                    last_status_time = current_time
+                if current_time >= next_status:
+                    if self.verbose:
+                        playing_tracks = self.engine.get_playing_tracks()
+                        is_muted = self.engine.is_muted("main_track")
+                        self._print(f"⏱️  {current_time:.1f}s - 播放轨道: {playing_tracks}, 主音轨静音: {is_muted}")
+                    next_status += status_interval
                 
-                time.sleep(0.1)
+                # 睡到下一个状态点，避免10Hz轮询引擎状态；已越过状态点时不睡
+                time.sleep(max(0.0, min(next_status, total_duration) - current_time))
             
             # 停止所有播放
             self._print("停止所有播放...", "TEST")
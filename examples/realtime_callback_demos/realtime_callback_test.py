@@ -14,15 +14,25 @@
 import os
 import sys
 import time
+import queue
 import threading
 import numpy as np
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, Tuple
 from realtimemix import AudioEngine
+from signal_utils import sine_wave, to_stereo
 
 
 class RealtimeCallbackTester:
     """实时音频回调功能测试器"""
     
+    PREFIX_MAP = {
+        "INFO": "ℹ️",
+        "SUCCESS": "✅",
+        "WARNING": "⚠️",
+        "ERROR": "❌",
+        "TEST": "🧪"
+    }
+    
     def __init__(self, sample_rate: int = 48000, buffer_size: int = 1024, verbose: bool = True):
         """
         初始化测试器
@@ -36,6 +46,11 @@ class RealtimeCallbackTester:
         self.buffer_size = buffer_size
         self.verbose = verbose
         
+        # 日志队列：回调线程中只做入队，由后台线程负责实际输出
+        self._log_q: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        if verbose:
+            threading.Thread(target=self._log_worker, daemon=True, name="TesterLog").start()
+        
         # 初始化音频引擎
         self.engine = AudioEngine(
             sample_rate=sample_rate,
@@ -63,57 +78,70 @@ class RealtimeCallbackTester:
             'end_time': None
         }
         
-        # 主音轨原始音量
-        self.main_track_original_volume = 1.0
+        # 加载完成后记录的轨道元数据（时长、采样率等不可变字段）
+        self._track_meta: Dict[str, Dict[str, Any]] = {}
+        
+        # 生成测试音频用的复用缓冲区
+        self._scratch: Optional[np.ndarray] = None
         
         self._print("✅ 实时音频回调测试器初始化完成")
     
     def _print(self, message: str, level: str = "INFO"):
-        """打印日志消息"""
+        """记录日志消息（非阻塞，实际输出由日志线程完成）"""
         if not self.verbose:
             return
-            
-        prefix_map = {
-            "INFO": "ℹ️",
-            "SUCCESS": "✅",
-            "WARNING": "⚠️",
-            "ERROR": "❌",
-            "TEST": "🧪"
-        }
         
-        prefix = prefix_map.get(level, "ℹ️")
-        print(f"{prefix} {message}")
+        self._log_q.put_nowait((level, message))
+    
+    def _log_worker(self):
+        """日志线程：从队列取出消息并打印"""
+        while True:
+            level, message = self._log_q.get()
+            prefix = self.PREFIX_MAP.get(level, "ℹ️")
+            print(f"{prefix} {message}")
+            self._log_q.task_done()
     
-    def generate_test_audio(self, duration: float, frequency: float = 440.0) -> np.ndarray:
+    def flush_log(self):
+        """等待所有排队的日志输出完毕"""
+        if self.verbose:
+            self._log_q.join()
+    
+    def generate_test_audio(self, duration: float, frequency: float = 440.0,
+                            out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         生成测试音频数据
         
         Args:
             duration (float): 音频时长（秒）
             frequency (float): 频率（Hz）
+            out (np.ndarray, optional): 预分配的 (frames, 2) float32 缓冲区，
+                行数足够时直接写入其前 frames 行，避免重复分配
             
         Returns:
-            np.ndarray: 立体声音频数据
+            np.ndarray: 立体声音频数据（使用 out 时为其视图）
         """
         frames = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, frames, False)
-        
-        # 生成正弦波
-        audio_signal = np.sin(2 * np.pi * frequency * t) * 0.5
         
-        # 添加包络以避免突变
-        envelope = np.ones_like(audio_signal)
-        fade_frames = int(0.01 * self.sample_rate)  # 10ms渐变
+        if (out is not None and out.dtype == np.float32 and out.ndim == 2
+                and out.shape[1] == 2 and out.shape[0] >= frames):
+            stereo = out[:frames]
+        else:
+            stereo = np.empty((frames, 2), dtype=np.float32)
         
-        # 渐入
-        envelope[:fade_frames] = np.linspace(0, 1, fade_frames)
-        # 渐出
-        envelope[-fade_frames:] = np.linspace(1, 0, fade_frames)
+        # 生成正弦波
+        mono = sine_wave(frequency, frames, self.sample_rate)
+        mono *= 0.5
         
-        audio_signal *= envelope
+        # 添加包络以避免突变（仅处理首尾渐变区域）
+        fade_frames = min(int(0.01 * self.sample_rate), frames)  # 10ms渐变
+        if fade_frames > 0:
+            # 渐入
+            mono[:fade_frames] *= np.linspace(0, 1, fade_frames)
+            # 渐出
+            mono[-fade_frames:] *= np.linspace(1, 0, fade_frames)
         
-        # 转换为立体声
-        return np.column_stack((audio_signal, audio_signal)).astype(np.float32)
+        # 写入左右声道
+        return to_stereo(mono, out=stereo)
     
     def start_engine(self) -> bool:
         """启动音频引擎"""
@@ -136,23 +164,23 @@ class RealtimeCallbackTester:
     def load_test_tracks(self) -> bool:
         """加载测试音轨"""
         try:
+            # 两条音轨共用一个足够容纳最长音轨的缓冲区；
+            # 引擎加载完成时已拷贝数据，因此等待完成后即可复用
+            if self._scratch is None:
+                self._scratch = np.empty((int(15.0 * self.sample_rate), 2), dtype=np.float32)
+            
             # 生成主音轨 (15秒, 440Hz)
-            main_audio = self.generate_test_audio(duration=15.0, frequency=440.0)
-            success = self.engine.load_track("main_track", main_audio, sample_rate=self.sample_rate)
-            if not success:
+            main_audio = self.generate_test_audio(duration=15.0, frequency=440.0, out=self._scratch)
+            if not self._load_and_wait("main_track", main_audio):
                 self._print("主音轨加载失败", "ERROR")
                 return False
             
             # 生成回调音频 (3秒, 880Hz - 高音)
-            callback_audio = self.generate_test_audio(duration=3.0, frequency=880.0)
-            success = self.engine.load_track("callback_audio", callback_audio, sample_rate=self.sample_rate)
-            if not success:
+            callback_audio = self.generate_test_audio(duration=3.0, frequency=880.0, out=self._scratch)
+            if not self._load_and_wait("callback_audio", callback_audio):
                 self._print("回调音频加载失败", "ERROR")
                 return False
             
-            # 等待轨道完全加载
-            time.sleep(0.5)
-            
             # 验证轨道加载状态
             if not self.engine.is_track_loaded("main_track"):
                 self._print("主音轨未正确加载", "ERROR")
@@ -162,6 +190,11 @@ class RealtimeCallbackTester:
                 self._print("回调音频未正确加载", "ERROR")
                 return False
             
+            # 记录不可变的轨道元数据，回调中无需再次查询引擎
+            self._track_meta = {
+                "callback_audio": self.engine.get_track_info("callback_audio") or {},
+            }
+            
             self._print("所有测试音轨加载成功", "SUCCESS")
             return True
             
@@ -169,6 +202,20 @@ class RealtimeCallbackTester:
             self._print(f"加载测试音轨失败: {e}", "ERROR")
             return False
     
+    def _load_and_wait(self, track_id: str, audio: np.ndarray, timeout: float = 5.0) -> bool:
+        """加载音轨并等待引擎的加载完成回调"""
+        loaded = threading.Event()
+        result = {'success': False}
+        
+        def on_complete(track_id: str, success: bool, error: Optional[str] = None):
+            result['success'] = success
+            loaded.set()
+        
+        if not self.engine.load_track(track_id, audio, sample_rate=self.sample_rate,
+                                      on_complete=on_complete):
+            return False
+        return loaded.wait(timeout) and result['success']
+    
     def audio_insertion_callback(self, track_id: str, target_time: float, actual_time: float):
         """
         音频插入回调函数
@@ -187,11 +234,6 @@ class RealtimeCallbackTester:
             self.test_results['timing_precision'].append(precision_ms)
             self._print(f"⏱️ 时间精度: {precision_ms:.2f}ms")
             
-            # 记录主音轨原始音量
-            main_info = self.engine.get_track_info("main_track")
-            if main_info:
-                self.main_track_original_volume = main_info.get('volume', 1.0)
-            
             # 1. 主音轨静音
             self._print("🔇 主音轨静音中...")
             success = self.engine.mute("main_track")
@@ -209,21 +251,24 @@ class RealtimeCallbackTester:
             
             # 2. 播放回调音频
             self._print("🔊 开始播放回调音频...")
-            callback_info = self.engine.get_track_info("callback_audio")
-            if callback_info:
-                self.callback_audio_info['duration'] = callback_info.get('duration', 3.0)
-                self.callback_audio_info['track_id'] = "callback_audio"
-                self.callback_audio_info['start_time'] = time.time()
+            self.callback_audio_info['duration'] = self._track_meta.get("callback_audio", {}).get('duration', 3.0)
+            self.callback_audio_info['track_id'] = "callback_audio"
+            self.callback_audio_info['start_time'] = time.time()
             
             # 播放回调音频
             self.engine.play("callback_audio", volume=0.8)
             self.test_results['callback_audio_played'] = True
             self._print("✅ 回调音频开始播放")
             
-            # 启动定时器来恢复主音轨
-            recovery_delay = self.callback_audio_info['duration'] + 0.1  # 额外100ms确保播放完成
-            recovery_timer = threading.Timer(recovery_delay, self._restore_main_track)
-            recovery_timer.start()
+            # 在回调音频接近结尾处注册位置回调来恢复主音轨，按音频时钟触发而非额外的定时器线程
+            # （轨道播放结束后位置会复位，因此目标点取结尾前50ms，容忍窗口覆盖一个缓冲区）
+            recovery_time = max(0.0, self.callback_audio_info['duration'] - 0.05)
+            self.engine.register_position_callback(
+                track_id="callback_audio",
+                target_time=recovery_time,
+                callback_func=lambda *_: self._restore_main_track(),
+                tolerance=0.03
+            )
             
         except Exception as e:
             self._print(f"回调处理失败: {e}", "ERROR")
@@ -233,8 +278,7 @@ class RealtimeCallbackTester:
         try:
             self._print("🔊 恢复主音轨播放...")
             
-            # 停止回调音频
-            self.engine.stop("callback_audio", fade_out=False)
+            # 回调音频只剩最后不到50ms（含其10ms淡出），让它自然播完，不再硬切停止
             self.callback_audio_info['end_time'] = time.time()
             
             # 恢复主音轨
@@ -283,6 +327,18 @@ class RealtimeCallbackTester:
             
             self._print("✅ 位置回调注册成功")
             
+            # 在主音轨播放结束点注册完成回调，由引擎通知而非轮询
+            done_evt = threading.Event()
+            done_registered = self.engine.register_position_callback(
+                track_id="main_track",
+                target_time=main_track_duration,
+                callback_func=lambda *_: done_evt.set(),
+                tolerance=0.05
+            )
+            if not done_registered:
+                # 例如 main_track_duration 超过音轨长度，此时按时长等待
+                self._print("完成回调注册失败，改为按播放时长等待", "WARNING")
+            
             # 开始播放主音轨
             self._print("🎵 开始播放主音轨...")
             self.engine.play("main_track", volume=0.7)
@@ -291,18 +347,17 @@ class RealtimeCallbackTester:
             # 监控播放状态
             self._print(f"⏳ 播放监控中... (总时长: {main_track_duration}s)")
             
-            while time.time() - start_time < main_track_duration:
-                # 获取当前播放状态
-                main_info = self.engine.get_track_info("main_track")
-                callback_info = self.engine.get_track_info("callback_audio")
-                
-                current_time = time.time() - start_time
-                
-                if self.verbose and int(current_time) % 2 == 0 and current_time - int(current_time) < 0.1:
-                    playing_tracks = self.engine.get_playing_tracks()
-                    self._print(f"⏱️  {current_time:.1f}s - 播放中的轨道: {playing_tracks}")
-                
-                time.sleep(0.1)
+            if self.verbose:
+                monitor = threading.Thread(
+                    target=self._monitor_playback, args=(done_evt, start_time), daemon=True
+                )
+                monitor.start()
+            
+            if done_registered:
+                done_evt.wait(timeout=main_track_duration + 2.0)
+            else:
+                done_evt.wait(timeout=main_track_duration)
+            done_evt.set()  # 超时情况下同样通知监控线程退出
             
             # 停止所有播放
             self._print("⏹️  停止所有播放...")
@@ -315,6 +370,13 @@ class RealtimeCallbackTester:
             self._print(f"测试执行失败: {e}", "ERROR")
             return self.test_results
     
+    def _monitor_playback(self, done_evt: threading.Event, start_time: float):
+        """每2秒输出一次播放状态，直到测试完成"""
+        while not done_evt.wait(2.0):
+            current_time = time.time() - start_time
+            playing_tracks = self.engine.get_playing_tracks()
+            self._print(f"⏱️  {current_time:.1f}s - 播放中的轨道: {playing_tracks}")
+    
     def _generate_test_report(self) -> Dict[str, Any]:
         """生成测试报告"""
         report = {
@@ -348,6 +410,7 @@ class RealtimeCallbackTester:
     
     def print_test_report(self, report: Dict[str, Any]):
         """打印测试报告"""
+        self.flush_log()
         print("\n" + "="*60)
         print("🧪 实时音频回调功能测试报告")
         print("="*60)
@@ -396,7 +459,8 @@ def main():
         if not tester.load_test_tracks():
             return False
         
-        # 运行测试
+        # 运行测试（先输出排队中的日志，保证顺序）
+        tester.flush_log()
         print("\n🚀 开始测试...")
         report = tester.run_test(
             callback_time=5.0,  # 5秒时插入音频
@@ -409,14 +473,17 @@ def main():
         return report['test_passed']
         
     except KeyboardInterrupt:
+        tester.flush_log()
         print("\n⏹️  测试被用户中断")
         return False
     except Exception as e:
+        tester.flush_log()
         print(f"\n❌ 测试失败: {e}")
         return False
     finally:
         # 清理资源
         tester.stop_engine()
+        tester.flush_log()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回调演示脚本共用的信号生成工具
+"""
+
+import numpy as np
+from typing import Optional
+
+
+def sine_wave(frequency: float, frames: int, sample_rate: int, block: int = 4096,
+              dtype=np.float32) -> np.ndarray:
+    """
+    生成单位幅度正弦波
+
+    按块使用和角公式 sin(a+b) = sin(a)cos(b) + cos(a)sin(b)：
+    sin/cos 只需对一个块长和每个块起点计算，其余样本仅为乘加运算。
+    相位以float64计算以保证精度，逐样本部分直接以dtype（默认float32）生成。
+    """
+    omega = 2.0 * np.pi * frequency / sample_rate
+    block = max(1, min(block, frames))
+    n_blocks = -(-frames // block)
+    phase = np.arange(block) * omega
+    starts = np.arange(n_blocks) * (block * omega)
+    wave = np.outer(np.sin(starts).astype(dtype), np.cos(phase).astype(dtype))
+    wave += np.outer(np.cos(starts).astype(dtype), np.sin(phase).astype(dtype))
+    return wave.ravel()[:frames]
+
+
+def to_stereo(mono: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    将单声道信号直接写入float32立体声缓冲区
+
+    out 为预分配的 (len(mono), 2) float32 缓冲区时直接写入，否则新建。
+    """
+    stereo = out if out is not None else np.empty((len(mono), 2), dtype=np.float32)
+    stereo[:, 0] = mono
+    stereo[:, 1] = stereo[:, 0]
+    return stereo
@@ -11,11 +11,28 @@ import time
 from realtimemix import AudioEngine
 
 
-def generate_test_audio(frequency, duration, sample_rate=48000):
-    """生成测试音频信号"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    sine_wave = 0.3 * np.sin(2 * np.pi * frequency * t)
-    return np.column_stack([sine_wave, sine_wave]).astype(np.float32)
+def generate_test_audio(frequency, duration, sample_rate=48000, index=None):
+    """
+    生成测试音频信号
+
+    index 为可选的共享样本索引向量（np.arange），长度不小于所需帧数时直接切片复用。
+    """
+    frames = int(sample_rate * duration)
+    if index is None or len(index) < frames:
+        index = np.arange(frames, dtype=np.float64)
+
+    stereo = np.empty((frames, 2), dtype=np.float32)
+    np.sin(index[:frames] * (2 * np.pi * frequency / sample_rate), out=stereo[:, 0])
+    stereo[:, 0] *= 0.3
+    stereo[:, 1] = stereo[:, 0]
+    return stereo
+
+
+def generate_test_tones(specs, sample_rate=48000):
+    """按 (频率, 时长) 列表批量生成测试音频，所有音调共享同一个样本索引向量"""
+    max_frames = max(int(sample_rate * duration) for _, duration in specs)
+    index = np.arange(max_frames, dtype=np.float64)
+    return [generate_test_audio(freq, duration, sample_rate, index) for freq, duration in specs]
 
 
 def main():
@@ -35,10 +52,14 @@ def main():
         
         # 生成测试音频
         print("\n📢 生成测试音频...")
-        engine.load_track("tone_440", generate_test_audio(440, 10.0))  # A音，10秒
-        engine.load_track("tone_523", generate_test_audio(523, 8.0))   # C音，8秒
-        engine.load_track("tone_659", generate_test_audio(659, 6.0))   # E音，6秒
-        engine.load_track("background", generate_test_audio(220, 30.0)) # 背景音，30秒
+        tones = {
+            "tone_440": (440, 10.0),    # A音，10秒
+            "tone_523": (523, 8.0),     # C音，8秒
+            "tone_659": (659, 6.0),     # E音，6秒
+            "background": (220, 30.0),  # 背景音，30秒
+        }
+        for track_id, audio in zip(tones, generate_test_tones(list(tones.values()))):
+            engine.load_track(track_id, audio)
         
         print("✅ 测试音频已生成")
         
@@ -63,26 +84,19 @@ def main():
         print("\n🎵 演示3：多轨定时调度")
         print("安排音频序列播放：立即播放523Hz → 2秒后播放659Hz → 4秒后播放440Hz")
         
+        # 每段的停止都交给 play_for_duration 内置调度，主线程只负责按顺序启动
         # 立即播放第一个
         engine.play_for_duration("tone_523", 1.5, fade_in=True)
+        time.sleep(2.0)
         
-        # 2秒后播放第二个
-        engine.play("tone_659", fade_in=True)
-        engine.pause("tone_659")  # 先暂停
-        # 安排2秒后恢复，播放1.5秒后停止
-        engine.stop("tone_659", delay_sec=2.0 + 1.5, fade_duration=0.5)
-        
-        # 简化：直接用延迟播放
-        def delayed_play():
-            engine.resume("tone_659")
-        
-        import threading
-        threading.Timer(2.0, delayed_play).start()
+        # 2秒后播放第二个，播放1.5秒后用0.5秒淡出
+        engine.play_for_duration("tone_659", 1.5, fade_in=True, fade_out_duration=0.5)
+        time.sleep(2.0)
         
         # 4秒后播放第三个
-        threading.Timer(4.0, lambda: engine.play_for_duration("tone_440", 1.5)).start()
+        engine.play_for_duration("tone_440", 1.5)
         
-        time.sleep(7)  # 等待序列播放完成
+        time.sleep(3)  # 等待序列播放完成
         print("✅ 音频序列播放完成")
         
         # 演示4：定时任务管理
@@ -113,23 +127,22 @@ def main():
         print("模拟播客场景：intro音乐 → 主要内容 → outro音乐")
         
         # 重新加载更长的音频用于演示
-        engine.load_track("intro", generate_test_audio(440, 5.0))
-        engine.load_track("main", generate_test_audio(523, 8.0))
-        engine.load_track("outro", generate_test_audio(659, 3.0))
+        podcast = {"intro": (440, 5.0), "main": (523, 8.0), "outro": (659, 3.0)}
+        for track_id, audio in zip(podcast, generate_test_tones(list(podcast.values()))):
+            engine.load_track(track_id, audio)
         
         # intro音乐播放3秒后淡出
         engine.play_for_duration("intro", 3.0, fade_in=True, fade_out=True)
+        time.sleep(2.0)
         
-        # 2秒后开始主要内容，播放5秒
-        engine.play("main")
-        engine.pause("main")
-        threading.Timer(2.0, lambda: engine.resume("main")).start()
-        engine.stop("main", delay_sec=2.0 + 5.0, fade_duration=1.0)
+        # 2秒后开始主要内容，播放5秒后用1秒淡出
+        engine.play_for_duration("main", 5.0, fade_out_duration=1.0)
+        time.sleep(5.0)
         
         # 7秒后播放outro
-        threading.Timer(7.0, lambda: engine.play_for_duration("outro", 2.0, fade_in=True)).start()
+        engine.play_for_duration("outro", 2.0, fade_in=True)
         
-        time.sleep(10)
+        time.sleep(3)
         print("✅ 播客场景演示完成")
         
         # 性能统计
@@ -13,12 +13,14 @@ import time
 def create_test_audio(duration=3.0, frequency=440, sample_rate=48000, volume=0.5):
     """创建测试音频数据"""
     samples = int(duration * sample_rate)
-    t = np.linspace(0, duration, samples, False)
-    # 创建正弦波
-    audio = volume * np.sin(2 * np.pi * frequency * t)
+    stereo_audio = np.empty((samples, 2), dtype=np.float32)
+    mono = stereo_audio[:, 0]
+    # 创建正弦波：相位按float64计算以保证长音频的精度，结果直接写入float32左声道
+    np.sin(np.arange(samples) * (2 * np.pi * frequency / sample_rate), out=mono)
+    mono *= np.float32(volume)
     # 转换为立体声
-    stereo_audio = np.column_stack([audio, audio])
-    return stereo_audio.astype(np.float32)
+    stereo_audio[:, 1] = mono
+    return stereo_audio
 
 
 def main():
@@ -226,8 +226,8 @@ class AudioEngine:
             这是一个守护线程，会一直运行直到收到停止信号（None任务）
         """
         while True:
+            task = self.loading_queue.get()
             try:
-                task = self.loading_queue.get()
                 if task is None:  # Stop signal
                     break
 
@@ -274,12 +274,13 @@ class AudioEngine:
 
                     if on_complete:
                         on_complete(track_id, True)
-
-                self.loading_queue.task_done()
             except Exception as e:
                 logger.error(f"Error in loading worker: {str(e)}")
                 if on_complete:
                     on_complete(track_id, False, str(e))
+            finally:
+                # 无论成功与否都标记完成，reset() 依赖未完成计数等待进行中的加载
+                self.loading_queue.task_done()
 
     def _load_track_from_file_optimized(
         self,
@@ -3269,6 +3270,86 @@ class AudioEngine:
                 self.unload_track(track_id)
             logger.info("All tracks cleared")
 
+    def reset(self) -> None:
+        """
+        重置引擎到初始状态，但保持音频流和后台线程运行
+
+        取消所有定时任务，清除位置回调和全局监听器，丢弃尚未开始的加载任务并等待
+        进行中的加载结束，卸载所有轨道（包括流式轨道），并清零性能统计。与 shutdown() 不同，重置后的引擎可以立即继续使用，
+        适合在多次独立的使用之间复用同一个引擎实例（例如测试会话中共享引擎）。
+
+        Example:
+            >>> engine.reset()
+            >>> print(engine.get_track_count()["total"])
+            0
+        """
+        self.cancel_all_scheduled_tasks()
+        self.clear_all_position_callbacks()
+        self._flush_loading_queue()
+
+        with self.lock:
+            for track_id in list(self.tracks.keys()) + list(self.streaming_tracks.keys()):
+                self.unload_track(track_id)
+
+            # 清理卸载流程未覆盖的残留状态
+            self.track_states.clear()
+            self.active_tracks.clear()
+            self.track_files.clear()
+            self.last_position_check_time.clear()
+            self.callback_stats.update({
+                'total_callbacks_triggered': 0,
+                'total_callbacks_expired': 0,
+                'average_precision_ms': 0.0,
+                'last_check_time': 0.0
+            })
+
+            self.peak_level = 0.0
+            self.cpu_usage = 0.0
+            self.underrun_count = 0
+            self.callback_count = 0
+
+        logger.info("Audio engine reset")
+
+    def _flush_loading_queue(self, timeout: float = 5.0) -> None:
+        """
+        清空加载队列并等待进行中的加载完成
+
+        尚未开始的任务直接丢弃，并以失败状态通知其 on_complete；队列中的停止信号会被保留。
+        之后等待加载线程处理完手上的任务，防止其结果在调用方清理状态之后才写入。
+
+        Args:
+            timeout (float, optional): 等待进行中加载的最长时间（秒）。默认为5.0
+        """
+        pending = []
+        while True:
+            try:
+                pending.append(self.loading_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for task in pending:
+            if task is None:
+                self.loading_queue.put(None)  # 保留停止信号
+            else:
+                track_id, on_complete = task[0], task[7]
+                if on_complete:
+                    try:
+                        on_complete(track_id, False, "Loading cancelled by engine reset")
+                    except Exception as e:
+                        logger.error(f"Error in on_complete for cancelled load {track_id}: {e}")
+            self.loading_queue.task_done()
+
+        # 在加载线程内调用（如在 on_complete 中重置）时不能等待自身
+        if threading.current_thread() is self.loading_thread:
+            return
+
+        with self.loading_queue.all_tasks_done:
+            finished = self.loading_queue.all_tasks_done.wait_for(
+                lambda: self.loading_queue.unfinished_tasks == 0, timeout=timeout
+            )
+        if not finished:
+            logger.warning(f"Timed out after {timeout}s waiting for in-flight track loads")
+
     def _extract_audio_chunk_optimized(
         self,
         audio_data: npt.NDArray,
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试音频工具
+conftest 与各测试模块共用的信号生成函数
+"""
+
+import numpy as np
+
+
+def generate_test_audio(duration: float, sample_rate: int = 44100, channels: int = 1, 
+                       frequency: float = 440.0) -> np.ndarray:
+    """生成测试音频数据（float32）"""
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    audio = np.empty((len(t), channels), dtype=np.float32)
+    np.sin(2 * np.pi * frequency * t, out=audio[:, 0], casting='unsafe')
+    
+    if channels == 2:
+        np.sin(2 * np.pi * frequency * 1.5 * t, out=audio[:, 1], casting='unsafe')  # 稍微不同的频率
+    
+    audio *= np.float32(0.5)
+    return audio
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试音频语料生成
+按参数组合生成正弦波及特殊测试文件，并用清单校验缓存
+
+本模块只依赖 numpy/soundfile，进程池的 spawn 子进程导入它时不会加载 pytest 或 realtimemix。
+"""
+
+import numpy as np
+import functools
+import soundfile as sf
+import os
+import tempfile
+import contextlib
+import itertools
+import json
+import hashlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextlib.contextmanager
+def _atomic_output(filepath: str):
+    """
+    提供同目录下唯一的临时文件名，写完后原子地替换目标文件
+    
+    并发的会话或工作进程各写各的临时文件，读者只会看到完整的旧文件或新文件；
+    写入失败时删除临时文件。
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath),
+                                    prefix=os.path.basename(filepath) + ".",
+                                    suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextlib.contextmanager
+def _build_lock(corpus_dir: str):
+    """
+    跨进程互斥地生成语料（xdist 工作进程或并发会话）
+    
+    后拿到锁的进程重新读取清单，只会发现文件已生成，不会重复生成。
+    没有 fcntl 的平台不加锁，原子写入仍保证读者不会看到半截文件。
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(corpus_dir, ".build.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _CorpusManifest:
+    """
+    语料清单（manifest.json）
+    
+    记录每个文件的生成参数以及写入完成后的大小和修改时间，校验缓存只需一次 os.stat。
+    清单在文件写完后才更新，上次中断留下的半截文件不会被当作有效缓存。
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, corpus_dir: str):
+        self._path = os.path.join(corpus_dir, "manifest.json")
+        self._entries = {}
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("v") == self.VERSION:
+                self._entries = manifest["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    @staticmethod
+    def _entry(filepath: str, sr: int, frames: int, ch: int) -> dict:
+        stat = os.stat(filepath)
+        return {"sr": sr, "frames": frames, "ch": ch,
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    
+    def is_valid(self, filepath: str, sr: int, frames: int, ch: int) -> bool:
+        """检查缓存文件是否存在且与清单记录一致"""
+        entry = self._entries.get(os.path.basename(filepath))
+        if entry is None:
+            return False
+        try:
+            return entry == self._entry(filepath, sr, frames, ch)
+        except OSError:
+            return False
+    
+    def record(self, filepath: str, sr: int, frames: int, ch: int):
+        """记录一个已写完的文件"""
+        self._entries[os.path.basename(filepath)] = self._entry(filepath, sr, frames, ch)
+    
+    def save(self):
+        """原子地写回清单"""
+        with _atomic_output(self._path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"v": self.VERSION, "entries": self._entries}, f, indent=1)
+
+
+@functools.lru_cache(maxsize=None)
+def _fade_ramps(sr: int):
+    """生成10ms淡入/淡出斜坡（按采样率缓存，只读）"""
+    fade_samples = int(0.01 * sr)
+    fade_in = np.linspace(0, 1, fade_samples, dtype=np.float32)
+    fade_out = np.linspace(1, 0, fade_samples, dtype=np.float32)
+    fade_in.setflags(write=False)
+    fade_out.setflags(write=False)
+    return fade_in, fade_out
+
+
+@functools.lru_cache(maxsize=None)
+def _time_base(sr: int, duration: float) -> np.ndarray:
+    """生成时间轴（按(采样率, 时长)缓存，只读）"""
+    # 保持float64（float32相位在30s处误差过大）
+    t = np.linspace(0, duration, int(sr * duration), False)
+    t.setflags(write=False)
+    return t
+
+
+@functools.lru_cache(maxsize=None)
+def _sine_440(sr: int, duration: float) -> np.ndarray:
+    """440Hz（A4音符）正弦，float32（按(采样率, 时长)缓存，只读）"""
+    t = _time_base(sr, duration)
+    s440 = np.sin(2 * np.pi * 440 * t, out=np.empty(len(t), dtype=np.float32))
+    s440.setflags(write=False)
+    return s440
+
+
+def _sine_jobs(targets: dict, sr: int, duration: float) -> list:
+    """为同一(采样率, 时长)生成单声道/立体声正弦波写入任务，共享时间轴和440Hz正弦"""
+    s440 = _sine_440(sr, duration)
+    frames = len(s440)
+    fade_in, fade_out = _fade_ramps(sr)
+    fade_samples = len(fade_in)
+
+    jobs = []
+    for ch, filepath in targets.items():
+        if ch == 2:
+            # 立体声：左声道440Hz，右声道880Hz（复用440Hz的相位，直接写入float32）
+            phase = 2 * np.pi * 440 * _time_base(sr, duration)
+            s880 = np.sin(2 * phase, out=np.empty(frames, dtype=np.float32))
+            audio = np.vstack((s440, s880)).T
+        else:
+            # 复制一份，s440为缓存的只读数组
+            audio = s440[:, None].copy()
+
+        # 添加音量包络，避免突然开始/结束
+        # audio 恒为 (N, ch)，斜坡按列广播，单声道/立体声同一路径
+        if len(audio) > 2 * fade_samples:
+            audio[:fade_samples] *= fade_in[:, None]
+            audio[-fade_samples:] *= fade_out[:, None]
+
+        jobs.append((filepath, audio, sr))
+    return jobs
+
+
+def _write_pcm16(filepath: str, audio: np.ndarray, sr: int):
+    """预先转换为C连续的int16缓冲区后整块写出，libsndfile无需再做格式转换"""
+    pcm = np.empty(audio.shape, dtype=np.int16)
+    np.rint(np.clip(audio, -1.0, 1.0) * 32767, out=pcm, casting='unsafe')
+    # 临时文件扩展名为 .tmp，需显式指定 WAV 格式
+    with _atomic_output(filepath) as tmp_path:
+        with sf.SoundFile(tmp_path, 'w', sr, channels=audio.shape[1],
+                          subtype='PCM_16', format='WAV') as f:
+            f.buffer_write(pcm, dtype='int16')
+
+
+def corpus_key() -> str:
+    """
+    本模块源码的内容哈希，用作语料缓存目录名
+    
+    参数常量和生成逻辑都在本模块中，任何改动都会得到新的目录，无需手动维护版本号。
+    """
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+# 正弦波测试语料的参数组合
+CORPUS_SAMPLE_RATES = [22050, 44100, 48000]
+CORPUS_DURATIONS = [1.0, 5.0, 10.0, 30.0]
+CORPUS_CHANNELS = [1, 2]
+# 特殊测试文件：名称 -> (采样率, 帧数, 声道)
+CORPUS_SPECIAL_FILES = {
+    'silence': (44100, 44100, 2),
+    'low_volume': (44100, 88200, 1),
+    'high_volume': (44100, 88200, 1),
+    'complex': (44100, 220500, 1),
+}
+
+
+def corpus_paths(corpus_dir: str) -> dict:
+    """返回语料键到文件路径的映射（不访问磁盘）"""
+    files = {}
+    for sr, duration, ch in itertools.product(CORPUS_SAMPLE_RATES, CORPUS_DURATIONS,
+                                              CORPUS_CHANNELS):
+        files[f"{sr}_{duration}_{ch}"] = os.path.join(
+            corpus_dir, f"test_{sr}hz_{duration}s_{ch}ch.wav"
+        )
+    for name in CORPUS_SPECIAL_FILES:
+        files[name] = os.path.join(corpus_dir, f"{name}.wav")
+    return files
+
+
+def _special_jobs(targets: dict) -> list:
+    """生成特殊测试文件的写入任务（targets: 名称 -> 路径）"""
+    jobs = []
+    # 44100Hz下 n/44100 的时间轴与时长无关，2秒的440Hz正弦即5秒正弦的前88200个样本
+    
+    # 1. 静音文件
+    if 'silence' in targets:
+        silence = np.zeros((44100, 2), dtype=np.float32)
+        jobs.append((targets['silence'], silence, 44100))
+    
+    # 2. 低音量文件
+    if 'low_volume' in targets:
+        low_volume = _sine_440(44100, 5.0)[:88200] * np.float32(0.01)
+        jobs.append((targets['low_volume'], low_volume.reshape(-1, 1), 44100))
+    
+    # 3. 高音量文件（接近剪切）
+    if 'high_volume' in targets:
+        high_volume = _sine_440(44100, 5.0)[:88200] * np.float32(0.95)
+        jobs.append((targets['high_volume'], high_volume.reshape(-1, 1), 44100))
+    
+    # 4. 复杂波形（多频率）
+    if 'complex' in targets:
+        t = _time_base(44100, 5.0)
+        complex_wave = np.sin(2 * np.pi * 220 * t)
+        complex_wave += 0.5 * _sine_440(44100, 5.0)
+        complex_wave += 0.25 * np.sin(2 * np.pi * 880 * t)
+        # 标准化：max/min 两次归约求峰值，不产生 |x| 中间数组，再原地缩放
+        peak = max(complex_wave.max(), -complex_wave.min())
+        complex_wave *= 0.8 / peak
+        jobs.append((targets['complex'], complex_wave.astype(np.float32).reshape(-1, 1), 44100))
+    
+    return jobs
+
+
+def _build_one(task: tuple) -> list:
+    """
+    工作进程入口：生成并写出一组语料文件
+    
+    task 为 (采样率, 时长, 目标) 的正弦组，或 (None, None, 目标) 的特殊文件组。
+    音频只在工作进程内存在，返回 (路径, 采样率, 帧数, 声道) 供主进程更新清单。
+    """
+    sr, duration, targets = task
+    if sr is None:
+        jobs = _special_jobs(targets)
+    else:
+        jobs = _sine_jobs(targets, sr, duration)
+    
+    written = []
+    for filepath, audio, rate in jobs:
+        _write_pcm16(filepath, audio, rate)
+        written.append((filepath, rate, audio.shape[0], audio.shape[1]))
+    
+    # 释放时间轴/正弦缓存，不在进程中长期占用内存
+    _time_base.cache_clear()
+    _sine_440.cache_clear()
+    return written
+
+
+def _run_build_tasks(tasks: list) -> list:
+    """在进程池中并行执行语料生成任务，返回所有已写出的文件"""
+    if len(tasks) == 1:
+        return _build_one(tasks[0])
+    
+    # 固定使用 spawn：语料可能在音频引擎（PortAudio、加载线程）启动后才生成，
+    # 对已有线程的进程 fork 可能死锁。本模块不依赖 pytest/realtimemix，子进程导入开销小
+    workers = min(8, os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=mp.get_context("spawn")) as executor:
+        return [item for written in executor.map(_build_one, tasks) for item in written]
+
+
+def build_corpus(corpus_dir: str, files: dict):
+    """生成缓存中缺失或与清单不一致的语料文件"""
+    with _build_lock(corpus_dir):
+        manifest = _CorpusManifest(corpus_dir)
+        tasks = []
+        
+        # 每个(采样率, 时长)为一个任务，单声道/立体声共享时间轴和正弦
+        for sr, duration in itertools.product(CORPUS_SAMPLE_RATES, CORPUS_DURATIONS):
+            frames = int(sr * duration)
+            targets = {}
+            for ch in CORPUS_CHANNELS:
+                filepath = files[f"{sr}_{duration}_{ch}"]
+                if not manifest.is_valid(filepath, sr, frames, ch):
+                    targets[ch] = filepath
+        
+            if targets:
+                tasks.append((sr, duration, targets))
+        
+        # 特殊测试文件合为一个任务
+        special = {
+            name: files[name] for name, (sr, frames, ch) in CORPUS_SPECIAL_FILES.items()
+            if not manifest.is_valid(files[name], sr, frames, ch)
+        }
+        if special:
+            tasks.append((None, None, special))
+        
+        if tasks:
+            for filepath, sr, frames, ch in _run_build_tasks(tasks):
+                manifest.record(filepath, sr, frames, ch)
+            manifest.save()
@@ -6,124 +6,168 @@
 """
 
 import pytest
-import numpy as np
-import soundfile as sf
 import tempfile
 import os
-import shutil
+import getpass
+import stat
 from pathlib import Path
+from collections.abc import Mapping
 import time
 import logging
 from realtimemix import AudioEngine
+from ._audio_utils import generate_test_audio  # noqa: F401  供测试模块沿用 conftest 中的辅助函数
+from ._corpus import build_corpus, corpus_key, corpus_paths
 
 
-@pytest.fixture(scope="session")
-def test_audio_dir():
-    """创建临时目录存放测试音频文件"""
-    temp_dir = tempfile.mkdtemp(prefix="realtimemix_test_")
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+# 整个语料约32MB（int16）。/dev/shm 需通过 REALTIMEMIX_TEST_CACHE_SHM=1 显式启用，
+# 且剩余空间须留足余量：Docker 默认的64MB shm 即使为空也不会被选用
+_SHM_MIN_FREE_BYTES = 256 * 1024 * 1024
 
 
-@pytest.fixture(scope="session")
-def test_audio_files(test_audio_dir):
-    """生成各种测试音频文件"""
-    files = {}
+def _cache_dir_name() -> str:
+    """按用户区分的缓存目录名，避免多用户共享临时目录时互相占用或无权限写入"""
+    try:
+        owner = str(os.getuid())
+    except AttributeError:  # Windows 没有 getuid
+        owner = getpass.getuser()
+    return f"realtimemix-test-corpus-{owner}"
+
+
+def _default_cache_root() -> str:
+    """默认缓存根目录：系统临时目录；显式启用时使用内存文件系统 /dev/shm"""
+    if os.environ.get("REALTIMEMIX_TEST_CACHE_SHM") == "1":
+        shm = "/dev/shm"
+        try:
+            fs = os.statvfs(shm)
+            if os.access(shm, os.W_OK) and fs.f_bavail * fs.f_frsize >= _SHM_MIN_FREE_BYTES:
+                return shm
+        except (OSError, AttributeError):  # 目录不存在，或平台没有 statvfs（Windows）
+            pass
+    return tempfile.gettempdir()
+
+
+def _private_cache_root(path: Path) -> Path:
+    """
+    创建并校验按用户区分的缓存根目录
     
-    # 生成不同类型的测试音频
-    sample_rates = [22050, 44100, 48000]
-    durations = [1.0, 5.0, 10.0, 30.0]
-    channels = [1, 2]
+    该目录名可预测且位于全局可写的临时目录中：已存在的符号链接、属于其他用户
+    或权限不是0700的同名目录都不可信，此时改用 mkdtemp 新建的私有目录（不跨会话复用）。
+    """
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    if not hasattr(os, "getuid"):  # Windows 不做属主校验
+        return path
     
-    for sr in sample_rates:
-        for duration in durations:
-            for ch in channels:
-                # 生成正弦波音频
-                t = np.linspace(0, duration, int(sr * duration), False)
-                frequency = 440.0  # A4音符
-                audio = np.sin(2 * np.pi * frequency * t)
-                
-                if ch == 2:
-                    # 立体声：左声道440Hz，右声道880Hz
-                    left = np.sin(2 * np.pi * 440 * t)
-                    right = np.sin(2 * np.pi * 880 * t)
-                    audio = np.column_stack([left, right])
-                else:
-                    audio = audio.reshape(-1, 1)
-                
-                # 添加音量包络，避免突然开始/结束
-                fade_samples = int(0.01 * sr)  # 10ms淡入淡出
-                if len(audio) > 2 * fade_samples:
-                    fade_in = np.linspace(0, 1, fade_samples)
-                    fade_out = np.linspace(1, 0, fade_samples)
-                    if ch == 2:
-                        audio[:fade_samples] *= fade_in.reshape(-1, 1)
-                        audio[-fade_samples:] *= fade_out.reshape(-1, 1)
-                    else:
-                        audio[:fade_samples, 0] *= fade_in
-                        audio[-fade_samples:, 0] *= fade_out
-                
-                filename = f"test_{sr}hz_{duration}s_{ch}ch.wav"
-                filepath = os.path.join(test_audio_dir, filename)
-                sf.write(filepath, audio, sr)
-                
-                key = f"{sr}_{duration}_{ch}"
-                files[key] = filepath
+    st = os.lstat(path)
+    if (stat.S_ISLNK(st.st_mode) or not stat.S_ISDIR(st.st_mode)
+            or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o700):
+        logging.getLogger("test_realtimemix").warning(
+            f"Untrusted test cache directory {path}, using a private temporary directory"
+        )
+        return Path(tempfile.mkdtemp(prefix=f"{path.name}-"))
+    return path
+
+
+def _corpus_dir() -> Path:
+    """
+    返回测试音频语料的缓存目录（可通过 REALTIMEMIX_TEST_CACHE 环境变量覆盖根目录）
     
-    # 生成特殊测试文件
+    目录名取自语料生成模块的内容哈希。旧哈希的语料不会自动删除（其他检出可能正在使用），
+    清理方式见 tests/README.md。
+    """
+    corpus_name = f"corpus-{corpus_key()}"
+    override = os.environ.get("REALTIMEMIX_TEST_CACHE")
+    if override:
+        root = Path(override)
+    else:
+        root = _private_cache_root(Path(_default_cache_root()) / _cache_dir_name())
+    corpus_dir = root / corpus_name
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    return corpus_dir
+
+
+class _LazyCorpus(Mapping):
+    """
+    测试音频语料的惰性映射
     
-    # 1. 静音文件
-    silence = np.zeros((44100, 2))
-    files['silence'] = os.path.join(test_audio_dir, "silence.wav")
-    sf.write(files['silence'], silence, 44100)
+    键和路径在创建时即确定；首次取值时才检查缓存并一次性生成缺失文件，
+    只引用 fixture 而不取文件的测试完全不产生生成开销。
+    """
     
-    # 2. 低音量文件
-    low_volume = np.sin(2 * np.pi * 440 * np.linspace(0, 2, 88200)) * 0.01
-    files['low_volume'] = os.path.join(test_audio_dir, "low_volume.wav")
-    sf.write(files['low_volume'], low_volume.reshape(-1, 1), 44100)
+    def __init__(self, corpus_dir: str):
+        self._corpus_dir = corpus_dir
+        self._files = corpus_paths(corpus_dir)
+        self._ready = False
     
-    # 3. 高音量文件（接近剪切）
-    high_volume = np.sin(2 * np.pi * 440 * np.linspace(0, 2, 88200)) * 0.95
-    files['high_volume'] = os.path.join(test_audio_dir, "high_volume.wav")
-    sf.write(files['high_volume'], high_volume.reshape(-1, 1), 44100)
+    def __getitem__(self, key: str) -> str:
+        filepath = self._files[key]
+        if not self._ready:
+            build_corpus(self._corpus_dir, self._files)
+            self._ready = True
+        return filepath
     
-    # 4. 复杂波形（多频率）
-    t = np.linspace(0, 5, 220500)
-    complex_wave = (np.sin(2 * np.pi * 220 * t) + 
-                   0.5 * np.sin(2 * np.pi * 440 * t) + 
-                   0.25 * np.sin(2 * np.pi * 880 * t))
-    complex_wave = complex_wave / np.max(np.abs(complex_wave)) * 0.8  # 标准化
-    files['complex'] = os.path.join(test_audio_dir, "complex.wav")
-    sf.write(files['complex'], complex_wave.reshape(-1, 1), 44100)
+    def __iter__(self):
+        return iter(self._files)
     
-    return files
+    def __len__(self) -> int:
+        return len(self._files)
 
 
-@pytest.fixture
-def audio_engine():
-    """创建AudioEngine实例"""
-    engine = AudioEngine(
-        sample_rate=48000,
-        buffer_size=1024,
-        channels=2,
-        enable_streaming=True,
-        streaming_threshold_mb=10
-    )
+@pytest.fixture(scope="session")
+def test_audio_dir():
+    """测试音频文件目录（跨会话缓存，不在会话结束时删除）"""
+    return str(_corpus_dir())
+
+
+@pytest.fixture(scope="session")
+def test_audio_files(test_audio_dir):
+    """各种测试音频文件（键 -> 路径），首次访问时才生成"""
+    return _LazyCorpus(test_audio_dir)
+
+
+def _create_engine(**kwargs) -> AudioEngine:
+    """创建并启动测试用AudioEngine"""
+    engine = AudioEngine(sample_rate=48000, buffer_size=1024, channels=2, **kwargs)
     engine.start()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def _shared_audio_engine():
+    """会话内共享的AudioEngine（启用流式播放），音频流只打开一次"""
+    engine = _create_engine(enable_streaming=True, streaming_threshold_mb=10)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture(scope="session")
+def _shared_audio_engine_no_streaming():
+    """会话内共享的AudioEngine（不启用流式播放）"""
+    engine = _create_engine(enable_streaming=False)
     yield engine
     engine.shutdown()
 
 
 @pytest.fixture
-def audio_engine_no_streaming():
-    """创建不启用流式播放的AudioEngine实例"""
-    engine = AudioEngine(
-        sample_rate=48000,
-        buffer_size=1024,
-        channels=2,
-        enable_streaming=False
-    )
-    engine.start()
+def audio_engine(_shared_audio_engine):
+    """AudioEngine实例（会话内共享，每个测试结束后 reset）"""
+    yield _shared_audio_engine
+    _shared_audio_engine.reset()
+
+
+@pytest.fixture
+def audio_engine_no_streaming(_shared_audio_engine_no_streaming):
+    """不启用流式播放的AudioEngine实例（会话内共享，每个测试结束后 reset）"""
+    yield _shared_audio_engine_no_streaming
+    _shared_audio_engine_no_streaming.reset()
+
+
+@pytest.fixture
+def fresh_audio_engine():
+    """独立的全新AudioEngine实例，供需要冷启动引擎的测试使用"""
+    engine = _create_engine(enable_streaming=True, streaming_threshold_mb=10)
     yield engine
     engine.shutdown()
 
@@ -158,19 +202,3 @@ def assert_audio_properties(engine, track_id: str, expected_duration: float = No
             actual_duration = info['duration']
             # 允许1%的误差
             assert abs(actual_duration - expected_duration) / expected_duration < 0.01
-
-
-def generate_test_audio(duration: float, sample_rate: int = 44100, channels: int = 1, 
-                       frequency: float = 440.0) -> np.ndarray:
-    """生成测试音频数据"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    audio = np.sin(2 * np.pi * frequency * t) * 0.5
-    
-    if channels == 2:
-        left = np.sin(2 * np.pi * frequency * t) * 0.5
-        right = np.sin(2 * np.pi * frequency * 1.5 * t) * 0.5  # 稍微不同的频率
-        audio = np.column_stack([left, right])
-    else:
-        audio = audio.reshape(-1, 1)
-    
-    return audio 
\ No newline at end of file
@@ -5,7 +5,9 @@
 提供便捷的方式来运行位置回调相关的测试，包括精度测试、性能测试等。
 
 用法：
-    python run_position_callback_tests.py [test_type]
+    python run_position_callback_tests.py [test_type ...] [--subprocess] [--parallel]
+    
+可同时指定多个测试类型（如 basic stats precision），它们会在同一次pytest运行中执行。
     
 测试类型：
     - all: 运行所有位置回调测试
@@ -13,132 +15,126 @@
     - performance: 运行性能测试
     - basic: 运行基础功能测试
     - stats: 运行统计功能测试
+
+默认在当前进程内调用 pytest.main，复用已加载的解释器和模块；
+传入 --subprocess 则改为启动独立的 pytest 子进程（CI 中需要进程隔离时使用）。
+传入 --parallel 则通过 pytest-xdist 按测试类分发到多个工作进程（需安装 pytest-xdist）；
+精度测试对CPU负载敏感，因此默认串行运行。
 """
 
+import os
 import sys
 import subprocess
 import time
+import importlib.util
 from pathlib import Path
 
-def run_command(cmd: list) -> tuple[int, str, str]:
-    """运行命令并返回结果"""
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_FILE = "tests/test_position_callbacks.py"
+
+def run_command(cmd: list) -> int:
+    """运行命令并返回退出码（输出直接流式显示到终端，不在内存中缓冲）"""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=Path(__file__).parent.parent)
-        return result.returncode, result.stdout, result.stderr
+        result = subprocess.run(cmd, cwd=PROJECT_ROOT)
+        return result.returncode
     except Exception as e:
-        return 1, "", str(e)
+        print(f"❌ 命令执行失败: {e}")
+        return 1
 
-def run_all_tests():
-    """运行所有位置回调测试"""
-    print("🎵 运行所有位置回调测试...")
-    print("=" * 60)
+def run_pytest(args: list, use_subprocess: bool = False) -> bool:
+    """运行pytest，返回是否全部通过"""
+    if use_subprocess:
+        return run_command([sys.executable, "-m", "pytest"] + args) == 0
     
-    cmd = ["python", "-m", "pytest", "tests/test_position_callbacks.py", "-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
-    
-    return returncode == 0
+    # 测试路径相对项目根目录，进程内运行时临时切换工作目录
+    cwd = Path.cwd()
+    try:
+        os.chdir(PROJECT_ROOT)
+        return pytest.main(args) == 0
+    finally:
+        os.chdir(cwd)
 
-def run_precision_tests():
-    """运行精度测试"""
-    print("🎯 运行位置回调精度测试...")
-    print("=" * 60)
-    
-    cmd = ["python", "-m", "pytest", 
-           "tests/test_position_callbacks.py::TestCallbackPrecision", 
-           "-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
-    
-    return returncode == 0
+def all_tests_args() -> list:
+    """所有位置回调测试"""
+    return [TEST_FILE]
 
-def run_performance_tests():
-    """运行性能测试"""
-    print("⚡ 运行位置回调性能测试...")
-    print("=" * 60)
-    
-    cmd = ["python", "-m", "pytest", 
-           "tests/test_position_callbacks.py::TestPerformanceAndMemory", 
-           "-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
-    
-    return returncode == 0
+def precision_tests_args() -> list:
+    """精度测试"""
+    return [f"{TEST_FILE}::TestCallbackPrecision"]
 
-def run_basic_tests():
-    """运行基础功能测试"""
-    print("🔧 运行基础位置回调功能测试...")
-    print("=" * 60)
-    
-    cmd = ["python", "-m", "pytest", 
-           "tests/test_position_callbacks.py::TestBasicPositionCallbacks", 
-           "-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
-    
-    return returncode == 0
+def performance_tests_args() -> list:
+    """性能测试"""
+    return [f"{TEST_FILE}::TestPerformanceAndMemory"]
 
-def run_stats_tests():
-    """运行统计功能测试"""
-    print("📊 运行位置回调统计功能测试...")
-    print("=" * 60)
-    
-    cmd = ["python", "-m", "pytest", 
-           "tests/test_position_callbacks.py::TestCallbackStatistics", 
-           "-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
-    
-    return returncode == 0
+def basic_tests_args() -> list:
+    """基础功能测试"""
+    return [f"{TEST_FILE}::TestBasicPositionCallbacks"]
 
-def run_quick_test():
-    """运行快速测试（仅基础功能）"""
-    print("🚀 运行快速位置回调测试...")
-    print("=" * 60)
-    
+def stats_tests_args() -> list:
+    """统计功能测试"""
+    return [f"{TEST_FILE}::TestCallbackStatistics"]
+
+def quick_test_args() -> list:
+    """快速测试（仅基础功能）"""
     # 运行基础测试和统计测试（不包含实际音频播放）
-    tests = [
-        "tests/test_position_callbacks.py::TestBasicPositionCallbacks::test_callback_registration",
-        "tests/test_position_callbacks.py::TestBasicPositionCallbacks::test_callback_removal",
-        "tests/test_position_callbacks.py::TestGlobalPositionListeners::test_global_listener_registration",
-        "tests/test_position_callbacks.py::TestErrorHandling::test_invalid_track_callback"
+    return [
+        f"{TEST_FILE}::TestBasicPositionCallbacks::test_callback_registration",
+        f"{TEST_FILE}::TestBasicPositionCallbacks::test_callback_removal",
+        f"{TEST_FILE}::TestGlobalPositionListeners::test_global_listener_registration",
+        f"{TEST_FILE}::TestErrorHandling::test_invalid_track_callback"
     ]
+
+# 测试类型 -> (标题, pytest目标生成函数)
+MODE_ARGS = {
+    "all": ("🎵 运行所有位置回调测试...", all_tests_args),
+    "precision": ("🎯 运行位置回调精度测试...", precision_tests_args),
+    "performance": ("⚡ 运行位置回调性能测试...", performance_tests_args),
+    "basic": ("🔧 运行基础位置回调功能测试...", basic_tests_args),
+    "stats": ("📊 运行位置回调统计功能测试...", stats_tests_args),
+    "quick": ("🚀 运行快速位置回调测试...", quick_test_args),
+}
+
+def parallel_args() -> list:
+    """pytest-xdist 并行参数；未安装时返回空列表（串行运行）"""
+    if importlib.util.find_spec("xdist") is None:
+        print("⚠️ 未安装 pytest-xdist，改为串行运行（pip install pytest-xdist）")
+        return []
+    # 位置回调用例都使用函数级引擎且不读取语料，彼此独立，按默认的逐用例分发即可
+    return ["-n", "auto"]
+
+def run_combined(modes: list, use_subprocess: bool = False, parallel: bool = False) -> bool:
+    """
+    在一次pytest收集中运行多个测试类型
+    
+    所有目标合并为一个参数列表，测试文件只收集一次，会话级fixture也只构建一次。
+    """
+    for mode in modes:
+        print(MODE_ARGS[mode][0])
+    print("=" * 60)
     
-    cmd = ["python", "-m", "pytest"] + tests + ["-v", "--tb=short"]
-    returncode, stdout, stderr = run_command(cmd)
-    
-    print(stdout)
-    if stderr:
-        print("警告或错误:")
-        print(stderr)
+    targets = []
+    for mode in modes:
+        for target in MODE_ARGS[mode][1]():
+            if target not in targets:
+                targets.append(target)
+    # 去掉已被更大范围目标覆盖的节点（如 quick 中的单个用例与 basic 的整个类），避免重复运行
+    targets = [
+        target for target in targets
+        if not any(target.startswith(other + "::") for other in targets)
+    ]
     
-    return returncode == 0
+    args = targets + ["-v", "--tb=short"]
+    if parallel:
+        args += parallel_args()
+    return run_pytest(args, use_subprocess)
 
 def print_usage():
     """打印使用说明"""
     print("位置回调测试运行脚本")
     print("=" * 60)
-    print("用法: python run_position_callback_tests.py [test_type]")
+    print("用法: python run_position_callback_tests.py [test_type ...] [--subprocess] [--parallel]")
     print()
     print("测试类型:")
     print("  all        - 运行所有位置回调测试（默认）")
@@ -149,16 +145,31 @@ def print_usage():
     print("  quick      - 运行快速测试（无音频播放）")
     print("  help       - 显示此帮助信息")
     print()
+    print("选项:")
+    print("  --subprocess - 在独立的pytest子进程中运行（默认在当前进程内运行）")
+    print("  --parallel   - 使用 pytest-xdist 多进程并行运行（需安装 pytest-xdist）")
+    print()
     print("示例:")
     print("  python run_position_callback_tests.py")
     print("  python run_position_callback_tests.py precision")
     print("  python run_position_callback_tests.py performance")
+    print("  python run_position_callback_tests.py basic stats precision")
 
 def main():
     """主函数"""
-    test_type = sys.argv[1] if len(sys.argv) > 1 else "all"
+    args = sys.argv[1:]
+    use_subprocess = "--subprocess" in args
+    parallel = "--parallel" in args
+    args = [arg for arg in args if arg not in ("--subprocess", "--parallel")]
+    modes = args or ["all"]
+    
+    if any(mode in ["help", "-h", "--help"] for mode in modes):
+        print_usage()
+        return
     
-    if test_type in ["help", "-h", "--help"]:
+    unknown = [mode for mode in modes if mode not in MODE_ARGS]
+    if unknown:
+        print(f"❌ 未知的测试类型: {', '.join(unknown)}")
         print_usage()
         return
     
@@ -166,22 +177,7 @@ def main():
     success = False
     
     try:
-        if test_type == "all":
-            success = run_all_tests()
-        elif test_type == "precision":
-            success = run_precision_tests()
-        elif test_type == "performance":
-            success = run_performance_tests()
-        elif test_type == "basic":
-            success = run_basic_tests()
-        elif test_type == "stats":
-            success = run_stats_tests()
-        elif test_type == "quick":
-            success = run_quick_test()
-        else:
-            print(f"❌ 未知的测试类型: {test_type}")
-            print_usage()
-            return
+        success = run_combined(modes, use_subprocess, parallel)
     
     except KeyboardInterrupt:
         print("\n⚠️ 测试被用户中断")
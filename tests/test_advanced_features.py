@@ -7,7 +7,6 @@
 
 import pytest
 import time
-import numpy as np
 import threading
 from realtimemix import AudioEngine
 
@@ -46,22 +45,6 @@ def load_track_with_wait(audio_engine, track_id: str, file_path: str, timeout: f
     return True
 
 
-def generate_test_audio(duration: float, sample_rate: int = 44100, channels: int = 1, 
-                       frequency: float = 440.0) -> np.ndarray:
-    """生成测试音频数据"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    audio = np.sin(2 * np.pi * frequency * t) * 0.5
-    
-    if channels == 2:
-        left = np.sin(2 * np.pi * frequency * t) * 0.5
-        right = np.sin(2 * np.pi * frequency * 1.5 * t) * 0.5  # 稍微不同的频率
-        audio = np.column_stack([left, right])
-    else:
-        audio = audio.reshape(-1, 1)
-    
-    return audio
-
-
 class TestSeamlessMixing:
     """无缝混音测试"""
     
@@ -162,6 +162,37 @@ class TestAudioEngineBasics:
         audio_engine.unload_track(track_id)
         assert track_id not in audio_engine.track_states
     
+    def test_engine_reset(self, fresh_audio_engine, test_audio_files):
+        """测试引擎重置：清空轨道和回调，音频流保持运行"""
+        engine = fresh_audio_engine
+        load_track_with_wait(engine, "reset_a", test_audio_files['44100_5.0_2'])
+        load_track_with_wait(engine, "reset_b", test_audio_files['48000_1.0_1'])
+        engine.register_position_callback("reset_a", 1.0, lambda *args: None)
+        engine.play("reset_a")
+        
+        # 排队中和进行中的加载不能在重置之后才落地
+        load_results = {}
+        
+        def on_complete(tid, success, error=None):
+            load_results[tid] = success
+        
+        for i in range(4):
+            assert engine.load_track(f"pending_{i}", test_audio_files['44100_30.0_2'],
+                                     on_complete=on_complete)
+        
+        engine.reset()
+        time.sleep(0.5)
+        
+        assert len(load_results) == 4
+        assert engine.is_running
+        assert len(engine.track_states) == 0
+        assert len(engine.active_tracks) == 0
+        assert engine.get_position_callback_stats()['active_callbacks'] == 0
+        
+        # 重置后引擎可以继续使用
+        load_track_with_wait(engine, "reset_a", test_audio_files['44100_1.0_2'])
+        assert "reset_a" in engine.track_states
+    
     def test_multiple_tracks(self, audio_engine, test_audio_files):
         """测试同时加载多个轨道"""
         tracks = {